@@ -2,34 +2,98 @@
 import pandas as pd
 import json
 import os
+import hashlib
 from fpdf import FPDF
+import shapely
 from shapely.geometry import shape, Point, Polygon
 import numpy as np
 import datetime
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 UPLOAD_FOLDER = 'uploads'
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+
+def _cache_path(file_path, ext):
+    """Cache filename keyed by a hash of the source file's full contents."""
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            md5.update(chunk)
+    digest = md5.hexdigest()[:12]
+    return os.path.join(UPLOAD_FOLDER, f'.cache_{digest}.{ext}')
+
+
+def _cum_vol(levels, areas):
+    """Cumulative trapezoidal volume (MCM) for matching level/area arrays."""
+    out = np.empty_like(areas)
+    acc = 0.0
+    prev_a = 0.0
+    prev_h = levels[0]
+    for i in range(len(levels)):
+        dh = levels[i] - prev_h
+        acc += ((areas[i] + prev_a) / 2) * (dh / 1000) * 1000 # km2 * m -> MCM
+        out[i] = acc
+        prev_a = areas[i]
+        prev_h = levels[i]
+    return out
+
+if njit is not None:
+    # Compile the accumulation to a straight-line LLVM loop; cache=True
+    # avoids re-JITting on subsequent processes. Pure-numpy cost at the
+    # current 20 levels is negligible, so numba stays optional.
+    _cum_vol = njit(cache=True)(_cum_vol)
+
 class DataProcessor:
     def __init__(self):
         self.boundary = None
         self.bathymetry = None
         self.results = None
+        self.bounds = None
 
     def process_boundary(self, file_path):
         """Parses GeoJSON boundary file."""
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # extract features (assuming single polygon for reservoir)
-            if 'features' in data:
-                geom = data['features'][0]['geometry']
+            # Re-uploads of the same file skip the parse entirely: the
+            # geometry is cached as WKB keyed by the file's content hash.
+            cache = _cache_path(file_path, 'wkb')
+            if os.path.exists(cache):
+                with open(cache, 'rb') as f:
+                    self.boundary = shapely.from_wkb(f.read())
             else:
-                geom = data['geometry']
-                
-            self.boundary = shape(geom)
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+
+                # Prefer shapely 2's compiled GeoJSON reader over a Python dict walk
+                try:
+                    geom = shapely.from_geojson(raw)
+                    # FeatureCollections come back as a GeometryCollection;
+                    # take the first geometry (assuming single polygon for reservoir)
+                    if geom.geom_type == 'GeometryCollection':
+                        geom = geom.geoms[0]
+                    self.boundary = geom
+                except Exception:
+                    # Fallback: plain json + shape (pre-shapely-2 path)
+                    data = json.loads(raw)
+
+                    # extract features (assuming single polygon for reservoir)
+                    if 'features' in data:
+                        geom = data['features'][0]['geometry']
+                    else:
+                        geom = data['geometry']
+
+                    self.boundary = shape(geom)
+
+                with open(cache, 'wb') as f:
+                    f.write(shapely.to_wkb(self.boundary))
+            # Cache bounds once per boundary; shapely's bounds traverses the
+            # geometry on every access and the volume curve reads it per call.
+            self.bounds = self.boundary.bounds # (minx, miny, maxx, maxy)
             return {"status": "success", "message": "Boundary loaded successfully", "area_km2": self.boundary.area * 10000} # Roughly deg to km? No, projection needed. Keeping simple.
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -37,14 +101,41 @@ class DataProcessor:
     def process_bathymetry(self, file_path):
         """Parses CSV bathymetry (Lat, Lon, Elevation)."""
         try:
-            df = pd.read_csv(file_path)
-            # Normalize columns
-            df.columns = [c.lower().strip() for c in df.columns]
-            
+            # Parquet cache keyed by content hash: re-uploads of the same CSV
+            # reload in one typed columnar read instead of a full re-parse.
+            # Best-effort - skipped when no parquet engine is installed.
+            cache = _cache_path(file_path, 'parquet')
+            if os.path.exists(cache):
+                try:
+                    self.bathymetry = pd.read_parquet(cache)
+                    return {"status": "success", "message": f"Loaded {len(self.bathymetry)} elevation points"}
+                except Exception:
+                    pass
+
+            # Sniff the header only, then do a single typed, columnar read.
+            # float32 halves memory vs the default float64 inference pass.
+            header = pd.read_csv(file_path, nrows=0)
+            rename = {}
+            for c in header.columns:
+                key = c.lower().strip()
+                key = {'latitude': 'lat', 'longitude': 'lon'}.get(key, key)
+                rename[c] = key
+
             required = {'lat', 'lon', 'elevation'}
-            if not required.issubset(df.columns) and not {'latitude', 'longitude', 'elevation'}.issubset(df.columns):
+            if not required.issubset(rename.values()):
                  return {"status": "error", "message": "CSV must contain lat, lon, elevation columns"}
-            
+
+            usecols = [c for c, k in rename.items() if k in required]
+            df = pd.read_csv(file_path, usecols=usecols,
+                             dtype={c: np.float32 for c in usecols},
+                             engine='c')
+            df.columns = [rename[c] for c in df.columns]
+
+            try:
+                df.to_parquet(cache, compression='zstd')
+            except Exception:
+                pass
+
             self.bathymetry = df
             return {"status": "success", "message": f"Loaded {len(df)} elevation points"}
         except Exception as e:
@@ -63,62 +154,62 @@ class DataProcessor:
         if d_res['status'] == 'error': return d_res
         
         df = self.bathymetry
-        
-        # Determine range
-        min_elev = df['elevation'].min()
-        max_elev = df['elevation'].max()
-        
+
+        lat = df['lat'].to_numpy(dtype=np.float64)
+        lon = df['lon'].to_numpy(dtype=np.float64)
+        elev = df['elevation'].to_numpy(dtype=np.float64)
+
+        # Keep only survey points inside the boundary; one vectorized GEOS
+        # call instead of constructing a Python Point per row. A cheap
+        # axis-aligned prefilter on the cached bounds trims the exact test.
+        minx, miny, maxx, maxy = self.bounds
+        bbox = (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+        inside = np.zeros(len(lon), dtype=bool)
+        inside[bbox] = shapely.contains_xy(self.boundary, lon[bbox], lat[bbox])
+        if not inside.any():
+            return {"status": "error", "message": "No bathymetry points fall inside the boundary"}
+        lat, lon, elev = lat[inside], lon[inside], elev[inside]
+
+        # Rasterize once: bin points into a fixed-resolution min-elevation
+        # grid. Counting raw points per level is biased by survey density;
+        # per-cell bed minima give each cell a real footprint instead.
+        # Resolution is roughly one cell per point, clamped so sparse uploads
+        # don't leave the grid mostly empty and dense ones stay bounded.
+        n_bins = int(np.clip(np.sqrt(len(elev)), 16, 512))
+
+        lon_edges = np.linspace(lon.min(), lon.max(), n_bins + 1)
+        lat_edges = np.linspace(lat.min(), lat.max(), n_bins + 1)
+        ix = np.clip(np.searchsorted(lon_edges, lon, side='right') - 1, 0, n_bins - 1)
+        iy = np.clip(np.searchsorted(lat_edges, lat, side='right') - 1, 0, n_bins - 1)
+
+        grid = np.full(n_bins * n_bins, np.inf)
+        np.minimum.at(grid, ix * n_bins + iy, elev)
+        sorted_cells = np.sort(grid[np.isfinite(grid)])
+
+        # Cell footprint in km2 (1 deg ~ 111 km, lon scaled by cos(lat))
+        dx_km = (lon_edges[1] - lon_edges[0]) * 111 * np.cos(np.radians(lat.mean()))
+        dy_km = (lat_edges[1] - lat_edges[0]) * 111
+        cell_area_km2 = dx_km * dy_km
+
+        min_elev = sorted_cells[0]
+        max_elev = sorted_cells[-1]
+
         levels = np.linspace(min_elev, max_elev, num=20)
-        results = []
-        
-        # Simple estimation: 
-        # Area at Level Z approx proportional to points <= Z within boundary
-        # For a real system, we'd generate a TIN or Grid. 
-        # Here: We count points below level L as "underwater".
-        
-        total_points = len(df)
-        
-        cumulative_vol = 0
-        prev_area = 0
-        prev_h = min_elev
-        
-        for h in levels:
-            # Count points below this elevation
-            # In a depression, lower elevation = deeper center.
-            # Water Level H means everything BELOW H is filled?
-            # Usually Bathymetry is bed elevation. Water fills from min_elev upwards.
-            
-            # Surface Area at Water Level H:
-            # Approximation: Fraction of points where Bed_Elevation <= H
-            underwater_points = df[df['elevation'] <= h]
-            frac_area = len(underwater_points) / total_points
-            
-            # Total Area factor (approximate scaling for prototype)
-            # Assuming the boundary defines the max extent (at max elev)
-            # Convert rough lat/lon area to km2 (very rough approximation for prototype)
-            # 1 deg ~ 111km. Area = deg^2 * 12321.
-            bounds = self.boundary.bounds # (minx, miny, maxx, maxy)
-            width = (bounds[2] - bounds[0]) * 111
-            height = (bounds[3] - bounds[1]) * 111
-            max_area_km2 = width * height * 0.7 # Correction factor for shape
-            
-            area_at_h = frac_area * max_area_km2
-            
-            # Volume Step (Trapezoidal)
-            dh = h - prev_h
-            d_vol = ((area_at_h + prev_area) / 2) * (dh / 1000) # km2 * m / 1000 = km3
-            cumulative_vol += d_vol * 1000 # to MCM
-            
-            results.append({
-                "Elevation (m)": round(h, 2),
-                "Surface Area (sq km)": round(area_at_h, 3),
-                "Volume (MCM)": round(cumulative_vol, 3)
-            })
-            
-            prev_area = area_at_h
-            prev_h = h
-            
-        self.results = pd.DataFrame(results)
+
+        # Surface area at level H = inundated cells (bed <= H) * cell area.
+        # One sort + one binary-search batch instead of a scan per level.
+        counts = np.searchsorted(sorted_cells, levels, side='right')
+        area_at_h = counts * cell_area_km2
+
+        # Volume Steps (Trapezoidal, cumulative)
+        cumulative_vol = _cum_vol(levels, area_at_h)
+
+        self.results = pd.DataFrame({
+            "Elevation (m)": np.round(levels, 2),
+            "Surface Area (sq km)": np.round(area_at_h, 3),
+            "Volume (MCM)": np.round(cumulative_vol, 3)
+        })
+        results = self.results.to_dict('records')
         return {"status": "success", "data": results}
 
     def generate_report(self, output_path="report.pdf"):
@@ -134,9 +225,9 @@ class DataProcessor:
         pdf.cell(200, 10, txt=f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}", ln=1, align='C')
         pdf.ln(10)
         
-        # Summary
-        max_vol = self.results.iloc[-1]['Volume (MCM)']
-        max_level = self.results.iloc[-1]['Elevation (m)']
+        # Summary (iat gives O(1) scalar access; iloc[-1] boxes a full row)
+        max_vol = self.results['Volume (MCM)'].iat[-1]
+        max_level = self.results['Elevation (m)'].iat[-1]
         
         pdf.set_font("Arial", 'B', 14)
         pdf.cell(200, 10, txt="Executive Summary", ln=1, align='L')
@@ -155,9 +246,11 @@ class DataProcessor:
         pdf.ln(row_height)
         
         pdf.set_font("Arial", size=10)
-        for _, row in self.results.iterrows():
-            for col in headers:
-                pdf.cell(col_width, row_height, str(row[col]), border=1)
+        # Pre-format every cell string in one pass; iterrows boxes a Series per row.
+        rows = self.results.to_numpy(dtype=str)
+        for row in rows:
+            for value in row:
+                pdf.cell(col_width, row_height, value, border=1)
             pdf.ln(row_height)
             
         pdf.output(output_path)
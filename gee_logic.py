@@ -1,25 +1,91 @@
 import ee
 import os
 import datetime
+import json
+import math
+import time
+import traceback
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from google.oauth2 import service_account
 
 # Set your Google Cloud Project ID here if you encounter permission errors
 # Example: GOOGLE_CLOUD_PROJECT = 'my-project-id'
 GOOGLE_CLOUD_PROJECT = 'neat-encoder-477511-b8'
 
 # Try to use service account credentials if available
-SERVICE_ACCOUNT_KEY = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', None) 
+SERVICE_ACCOUNT_KEY = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', None)
+
+# Set once by initialize_gee so repeat calls short-circuit without the
+# live REST probe the old "already initialized?" check required
+_INITIALIZED = False
+
+# Shared pool for all Earth Engine round-trips (getInfo, getMapId,
+# getDownloadURL). One process-wide pool lets concurrent requests fan out
+# against the high-volume endpoint instead of each spinning up and tearing
+# down its own few-worker pool.
+_EXECUTOR = ThreadPoolExecutor(max_workers=32)
+
+# Reused across requests; built lazily because ee proxy objects can only be
+# constructed after ee.Initialize has run
+_CLOUD_FILTER = None
+
+def _cloud_filter():
+    global _CLOUD_FILTER
+    if _CLOUD_FILTER is None:
+        _CLOUD_FILTER = ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)
+    return _CLOUD_FILTER
+
+# Tile URLs keyed by (serialized image, viz params): identical layer
+# requests across analyses reuse the url_format instead of repeating the
+# getMapId round-trip. Entries age out because GEE expires map IDs
+# server-side after a few hours.
+_MAPID_CACHE = {}
+_MAPID_TTL = 4 * 3600 # seconds
+_MAPID_MAX = 512
+
+def get_map_url(image, viz_params):
+    """Tile URL for an image/viz combination, cached per process."""
+    try:
+        key = (image.serialize(), json.dumps(viz_params, sort_keys=True))
+        now = time.time()
+        hit = _MAPID_CACHE.get(key)
+        if hit and now - hit[0] < _MAPID_TTL:
+            return hit[1]
+
+        map_id = image.getMapId(viz_params)
+        url = map_id['tile_fetcher'].url_format
+        while len(_MAPID_CACHE) >= _MAPID_MAX:
+            _MAPID_CACHE.pop(next(iter(_MAPID_CACHE)))
+        _MAPID_CACHE[key] = (now, url)
+        return url
+    except Exception as e:
+        print(f"Error generating map URL: {e}")
+        return None
+
+# Reducers, pixel-area image, and terrain proxies reused across requests,
+# cached lazily for the same reason as the cloud filter
+_EE_CONSTS = {}
+
+def _ee_consts():
+    if not _EE_CONSTS:
+        dem = ee.Image('NASA/NASADEM_HGT/001').select('elevation')
+        _EE_CONSTS.update(
+            sum=ee.Reducer.sum(),
+            sum_mean=ee.Reducer.sum().combine(ee.Reducer.mean(), sharedInputs=True),
+            pixel_area=ee.Image.pixelArea(),
+            dem=dem,
+            slope=ee.Terrain.slope(dem),
+        )
+    return _EE_CONSTS
 
 def initialize_gee():
     """Initializes Google Earth Engine."""
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+
     try:
-        # Check if already initialized
-        try:
-            ee.data.getInfo()
-            print("Google Earth Engine already initialized")
-            return
-        except:
-            pass
-        
         # Attempt to initialize with project ID
         # Attempt to initialize with project ID
         # Explicitly check for Service Account env var set in server.py
@@ -28,13 +94,13 @@ def initialize_gee():
         if sa_key and os.path.exists(sa_key):
             try:
                 print(f"loading service account from: {sa_key}")
-                from google.oauth2 import service_account
                 credentials = service_account.Credentials.from_service_account_file(sa_key)
                 scoped_credentials = credentials.with_scopes(['https://www.googleapis.com/auth/earthengine'])
                 
                 print(f"Attempting to initialize GEE with Service Account and project: {GOOGLE_CLOUD_PROJECT}")
                 ee.Initialize(credentials=scoped_credentials, project=GOOGLE_CLOUD_PROJECT, opt_url='https://earthengine-highvolume.googleapis.com')
                 print(f"Google Earth Engine initialized successfully with Service Account.")
+                _INITIALIZED = True
                 return
             except Exception as e:
                 print(f"Service Account Auth failed: {e}. Falling back to default...")
@@ -51,6 +117,7 @@ def initialize_gee():
         else:
             ee.Initialize()
             print("Google Earth Engine initialized successfully (default project).")
+        _INITIALIZED = True
     except ee.EEException as e:
         error_msg = str(e)
         print(f"Warning: GEE Initialization failed: {e}")
@@ -72,50 +139,51 @@ def initialize_gee():
         print(f"Warning: Unexpected error during GEE init: {e}")
         # raise
 
-def get_water_metrics(roi, start_date, end_date, scale=10):
+def get_water_metrics(collection, roi, start_date, end_date, scale=30):
     """
-    Calculates water area for a given time range within an ROI.
+    Builds the deferred water-area computation for a time range within an ROI.
+    Takes a pre-filtered Sentinel-2 collection so all callers share one
+    server-side graph. Returns (area ee.Number in sq meters, image,
+    collection size) without contacting the server; callers batch the
+    numbers into a single getInfo.
+
+    The default 30m scale reduces ~12x fewer pixels than 10m over the 2km
+    buffer and is plenty for comparative numbers (seasonal trends); pass
+    scale=10 only where the high-fidelity figure is reported directly.
     """
-    try:
-        dataset = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
-                  .filterBounds(roi) \
-                  .filterDate(start_date, end_date) \
-                  .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)) \
-                  .sort('CLOUDY_PIXEL_PERCENTAGE') # Get least cloudy
-        
-        image = dataset.first()
-        
-        if not image:
-            return 0, None
-        
-        # Calculate NDWI
-        ndwi = image.normalizedDifference(['B3', 'B8']).rename('NDWI')
-        water_mask = ndwi.gt(0.1).rename('Water')
-        
-        # Calculate Area
-        pixel_area = ee.Image.pixelArea()
-        water_area_image = pixel_area.mask(water_mask)
-        
-        stats = water_area_image.reduceRegion(
-            reducer=ee.Reducer.sum(),
-            geometry=roi,
-            scale=scale,
-            maxPixels=1e9
-        )
-        
-        area_sq_meters = stats.get('area').getInfo()
-        if area_sq_meters is None:
-            return 0, None
-            
-        return area_sq_meters / 1e6, image # Return km2 and the image used
-    except Exception as e:
-        print(f"Error in get_water_metrics: {e}")
-        return 0, None
+    dataset = collection.filterDate(start_date, end_date) \
+              .sort('CLOUDY_PIXEL_PERCENTAGE') # Get least cloudy
 
-def analyze_water(lat, lon):
+    # Handle empty ranges server-side: a zero sentinel stands in for first()
+    # so downstream math evaluates to zero area instead of failing the
+    # batched getInfo on a null element.
+    sentinel = ee.Image.constant([0, 0]).rename(['B3', 'B8']) \
+               .set('system:time_start', 0)
+    image = ee.Image(ee.Algorithms.If(dataset.size().gt(0), dataset.first(), sentinel))
+
+    # Calculate NDWI
+    ndwi = image.normalizedDifference(['B3', 'B8']).rename('NDWI')
+    water_mask = ndwi.gt(0.1).rename('Water')
+
+    # Calculate Area
+    consts = _ee_consts()
+    water_area_image = consts['pixel_area'].mask(water_mask)
+
+    stats = water_area_image.reduceRegion(
+        reducer=consts['sum'],
+        geometry=roi,
+        scale=scale,
+        maxPixels=1e9
+    )
+
+    return stats.get('area'), image, dataset.size()
+
+def iter_analyze_water(lat, lon):
     """
     Analyzes water at a specific location using Sentinel-2 and SRTM DEM.
-    Returns estimated area (km2), volume (MCM), and seasonal trends.
+    Generator: yields the scalar metrics (area, volume, seasonal trends) as
+    soon as they are evaluated, then the map layers once the tile URLs are
+    ready, so callers can stream partial results.
     """
     print(f"DEBUG: analyze_water called for {lat}, {lon}")
     try:
@@ -123,153 +191,179 @@ def analyze_water(lat, lon):
         point = ee.Geometry.Point([lon, lat])
         roi = point.buffer(2000) # 2km radius analysis window
         
+        # Shared base collection: bounds + cloud filter applied once; every
+        # metric and layer below derives from it via filterDate so the GEE
+        # server can cache the common intermediates.
+        s2 = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
+             .filterBounds(roi) \
+             .filter(_cloud_filter())
+
+        now = datetime.datetime.now()
+
         # 1. Current Status (Latest available in last 3 months) - Keep High Precision (10m)
-        end_date = datetime.datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.datetime.now() - datetime.timedelta(days=90)).strftime('%Y-%m-%d')
-        
-        current_area, current_image = get_water_metrics(roi, start_date, end_date, scale=10)
-        
+        end_date = now.strftime('%Y-%m-%d')
+        start_date = (now - datetime.timedelta(days=90)).strftime('%Y-%m-%d')
+
+        # Only the image and count are used here; the current-window area is
+        # folded into the fused reduction below (the helper's own area graph
+        # is deferred and never evaluated)
+        _, current_image, current_count = get_water_metrics(s2, roi, start_date, end_date, scale=10)
+
         # 2. Seasonal Analysis (Past Year) - Use Lower Precision (30m) for speed
-        current_year = datetime.datetime.now().year - 1
-        
-        winter_area = 0
-        summer_area = 0
-        monsoon_area = 0
-        
-        try:
-            # Winter (Jan-Feb)
-            winter_area, _ = get_water_metrics(roi, f'{current_year}-01-01', f'{current_year}-02-28', scale=30)
-            # Summer (Apr-May)
-            summer_area, _ = get_water_metrics(roi, f'{current_year}-04-01', f'{current_year}-05-31', scale=30)
-            # Monsoon (Aug-Sep)
-            monsoon_area, _ = get_water_metrics(roi, f'{current_year}-08-01', f'{current_year}-09-30', scale=30)
-        except Exception as e:
-            print(f"Seasonal analysis failed (skipping): {e}")
-            # Continue with 0s for seasonal (better than crashing)
-        
+        current_year = now.year - 1
+
+        # Season windows (name, start, end, layer palette), built once and
+        # shared by the area metrics and the map layers further down
+        seasons = [
+            ('winter', f'{current_year}-01-01', f'{current_year}-02-28', ['#a5f3fc', '#0891b2']),
+            ('summer', f'{current_year}-04-01', f'{current_year}-05-31', ['#fdba74', '#ea580c']),
+            ('monsoon', f'{current_year}-08-01', f'{current_year}-09-30', ['#86efac', '#16a34a']),
+        ]
+
+        seasonal_area_n = {}
+        seasonal_images = {}
+        for name, start, end, _ in seasons:
+            seasonal_area_n[name], seasonal_images[name], _ = get_water_metrics(s2, roi, start, end, scale=30)
+
         # 3. Elevation-Based Volume Estimation
-        # Using SRTM/NASADEM for topography
-        dem = ee.Image('NASA/NASADEM_HGT/001').select('elevation')
-        
-        # Calculate Average Elevation of the Water Surface
-        if current_image:
-            ndwi = current_image.normalizedDifference(['B3', 'B8'])
-            water_mask = ndwi.gt(0.1)
-            
-            # Get elevation of water pixels
-            water_elev = dem.updateMask(water_mask)
-            elev_stats = water_elev.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=roi,
-                scale=30,
-                maxPixels=1e9
-            )
-            avg_water_elev = elev_stats.get('elevation').getInfo() or 0
-        else:
-            avg_water_elev = 0
+        # Using SRTM/NASADEM for topography (cached proxy)
+        consts = _ee_consts()
+        dem = consts['dem']
+
+        # Average Elevation of the Water Surface (deferred)
+        ndwi = current_image.normalizedDifference(['B3', 'B8'])
+        water_mask = ndwi.gt(0.1)
+
+        # Get elevation of water pixels
+        water_elev = dem.updateMask(water_mask)
 
-        # Heuristic Volume: 
-        # Assume a depression shape. 
-        # Volume ~ Area * (Depth). 
+        # Heuristic Volume:
+        # Assume a depression shape.
+        # Volume ~ Area * (Depth).
         # We estimate Depth using terrain slope from DEM surrounding the water.
-        
-        slope = ee.Terrain.slope(dem)
+
+        slope = consts['slope']
         # Get slope at the shores (buffer around water mask not implemented for speed) - use ROI mean slope
-        slope_stats = slope.reduceRegion(
-            reducer=ee.Reducer.mean(),
+
+        # One fused reduction for the current window: water area (sum),
+        # water-surface elevation (mean), and slope (mean) stacked as bands
+        # (each keeping its own mask) so the imagery is traversed once at
+        # the high-fidelity 10m scale instead of three separate passes.
+        combined = consts['pixel_area'].updateMask(water_mask).rename('water_area') \
+            .addBands(water_elev.rename('elevation')) \
+            .addBands(slope.rename('slope'))
+        current_stats = combined.reduceRegion(
+            reducer=consts['sum_mean'],
             geometry=roi,
-            scale=30,
+            scale=10,
             maxPixels=1e9
         )
-        avg_slope_deg = slope_stats.get('slope').getInfo() or 5
-        import math
+
+        # Everything above is a deferred server-side graph. Bundle all the
+        # scalars into one dictionary so a single getInfo round-trip replaces
+        # the previous eight blocking calls.
+        payload = ee.Dictionary({
+            'current_area': current_stats.get('water_area_sum'),
+            'current_count': current_count,
+            **{f'{name}_area': area_n for name, area_n in seasonal_area_n.items()},
+            'avg_elev': current_stats.get('elevation_mean'),
+            'avg_slope': current_stats.get('slope_mean'),
+            'date': ee.Algorithms.If(current_count.gt(0),
+                                     current_image.date().format('YYYY-MM-dd'),
+                                     'N/A')
+        })
+
+        # Helper: water spread from the same least-cloudy seasonal image the
+        # area metric used, so each season is materialized once server-side
+        def get_seasonal_layer(image, palette):
+            try:
+                water = image.normalizedDifference(['B3', 'B8']).gt(0.1).selfMask()
+                return get_map_url(water, {'palette': palette})
+            except Exception as e:
+                print(f"Error creating seasonal layer: {e}")
+                return None
+
+        layers = {}
+        info_error = None
+        try:
+            info = payload.getInfo()
+        except Exception as e:
+            print(f"Batched metric evaluation failed (continuing with zeros): {e}")
+            info = {}
+            info_error = str(e)
+
+        current_area = (info.get('current_area') or 0) / 1e6 # m2 -> km2
+        seasonal_areas = {name: (info.get(f'{name}_area') or 0) / 1e6
+                          for name, _, _, _ in seasons}
+        has_current = (info.get('current_count') or 0) > 0
+        avg_water_elev = info.get('avg_elev') or 0
+        avg_slope_deg = info.get('avg_slope') or 5
+        image_date = info.get('date') or "N/A"
+
         avg_slope_rad = math.radians(avg_slope_deg)
-        
+
         # Model: Conical depression
         # Depth = Radius * tan(slope)
         # Radius = sqrt(Area / pi)
         # Volume = 1/3 * Area * Depth
-        
-        if current_area > 0:
-            radius_km = math.sqrt(current_area / math.pi)
-            estimated_depth_km = radius_km * math.tan(avg_slope_rad)
-            estimated_volume_km3 = (1/3) * current_area * estimated_depth_km
-            volume_mcm = estimated_volume_km3 * 1000 
-        else:
-            volume_mcm = 0
-
-        # Calculate Max Capacity based on Historical/Seasonal Max
-        max_area = max(current_area, winter_area, summer_area, monsoon_area)
-        if max_area > 0:
-             max_radius_km = math.sqrt(max_area / math.pi)
-             max_depth_km = max_radius_km * math.tan(avg_slope_rad)
-             max_vol_km3 = (1/3) * max_area * max_depth_km
-             max_vol_mcm = max_vol_km3 * 1000
-        else:
-             max_vol_mcm = volume_mcm * 1.2 # Fallback if no data
-            
-        # 4. Generate Visualization Layers (Map IDs)
-        # Helper to get Tile URL
-        def get_map_url(image, viz_params):
-            try:
-                map_id = image.getMapId(viz_params)
-                return map_id['tile_fetcher'].url_format
-            except Exception as e:
-                print(f"Error generating map URL: {e}")
-                return None
+        # Vectorized over [current, *seasons]; max capacity is then just the
+        # largest entry, and adding seasons costs nothing extra.
+        areas = np.array([current_area, *seasonal_areas.values()])
+        radii_km = np.sqrt(areas / np.pi)
+        depths_km = radii_km * np.tan(avg_slope_rad)
+        vols_mcm = (areas * depths_km / 3) * 1000
 
-        layers = {}
-        
-        # A. Seasonal Layers
-        # Define Palettes
-        water_viz = {'min': 0, 'max': 1, 'palette': ['white', 'blue']}
-        
-        # Get images for seasonal comparison (re-fetch to ensure we have images)
-        current_year = datetime.datetime.now().year - 1
-        
-        # Helper for mosaic/median
-        def get_seasonal_layer(start, end, palette):
-            try:
-                col = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
-                    .filterBounds(roi) \
-                    .filterDate(start, end) \
-                    .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)) \
-                    .map(lambda img: img.normalizedDifference(['B3', 'B8']).rename('NDWI'))
-                
-                # Create a composite (max NDWI to find water, or median)
-                # Max NDWI is good for "Water Spread" to show max extent
-                water_composite = col.max().gt(0.1).selfMask()
-                
-                return get_map_url(water_composite, {'palette': palette})
-            except Exception as e:
-                print(f"Error creating seasonal layer {start}-{end}: {e}")
-                return None
+        volume_mcm = float(vols_mcm[0])
+        max_vol_mcm = float(vols_mcm.max())
+        if max_vol_mcm == 0:
+            max_vol_mcm = volume_mcm * 1.2 # Fallback if no data
+
+        # The scalar metrics are complete; hand them to the caller before
+        # waiting on the tile URLs.
+        metrics = {
+            "area": round(current_area, 2),
+            "volume": round(volume_mcm, 2),
+            "max_volume": round(max_vol_mcm, 2),
+            "date": image_date,
+            "avg_elevation": round(avg_water_elev, 1),
+            "seasonal": {name: round(area, 2) for name, area in seasonal_areas.items()},
+        }
+        if info_error:
+            # The zeros above are a transient-failure fallback, not a real
+            # measurement; flag them so callers (and the result cache)
+            # don't treat the response as a valid analysis
+            metrics["error"] = f"Metric evaluation failed: {info_error}"
+        yield metrics
 
-        layers['winter'] = get_seasonal_layer(f'{current_year}-01-01', f'{current_year}-02-28', ['#a5f3fc', '#0891b2'])
-        layers['summer'] = get_seasonal_layer(f'{current_year}-04-01', f'{current_year}-05-31', ['#fdba74', '#ea580c'])
-        layers['monsoon'] = get_seasonal_layer(f'{current_year}-08-01', f'{current_year}-09-30', ['#86efac', '#16a34a'])
+        # 4. Generate Visualization Layers (Map IDs)
+        # A. Seasonal Layers - only requested for seasons that actually
+        # measured water, so a dry location skips all three tile
+        # round-trips. Submitted first, collected after the analytics
+        # layers are in flight, so everything below runs in parallel.
+        layer_futures = {name: _EXECUTOR.submit(get_seasonal_layer, seasonal_images[name], palette)
+                         for name, _, _, palette in seasons if seasonal_areas[name] > 0}
 
         # B. Analytics Layer: Professional Bathymetry & Contours
-        if current_image:
-            # 1. Base Water Mask
-            water_mask = current_image.normalizedDifference(['B3', 'B8']).gt(0.1)
+        if has_current:
+            # 1. Base Water Mask - reuse the NDWI mask built for the metric
+            # reductions so GEE sees one graph node instead of a duplicate
             lake_bed = dem.updateMask(water_mask)
             
             # 2. Depth Map (Gradient)
             # Use a standard bathymetric palette (Light to Dark Blue)
             # GEBCO style or similar
-            depth_map = ee.Image.constant(avg_water_elev).subtract(lake_bed).rename('depth')
+            # Water-surface elevation stays an ee.Number: the depth map is
+            # built entirely server-side from the fused reduction rather
+            # than round-tripping the client-side scalar back into the graph
+            avg_elev_num = ee.Number(current_stats.get('elevation_mean'))
+            depth_map = ee.Image.constant(avg_elev_num).subtract(lake_bed).rename('depth')
             depth_map = depth_map.where(depth_map.lt(0), 0)
             
             # Layers for Frontend
-            
+
             # Layer 1: Depth Gradient (Scientific Blue)
             props_depth = {'min': 0, 'max': 20, 'palette': ['#f7fbff', '#deebf7', '#c6dbef', '#9ecae1', '#6baed6', '#4292c6', '#2171b5', '#08519c', '#08306b']}
-            layers['depth'] = get_map_url(
-                depth_map.updateMask(depth_map.gt(0)),
-                props_depth
-            )
-            
+
             # Layer 2: Contours (Vector-like Lines)
             # Reliable math-based contours (every 2m)
             # Create lines where depth % interval is near 0
@@ -277,39 +371,57 @@ def analyze_water(lat, lon):
             # Use 'canny' edge detection or simple thresholding for cleaner lines
             # Here uses simple modulus for robustness
             contours = depth_map.toInt().mod(interval).eq(0).And(depth_map.gte(1))
-            
-            layers['analytics'] = get_map_url(
-                ee.Image(0).paint(ee.Geometry.Point([0,0]), 0, 1).where(contours, 1).updateMask(contours),
-                {'palette': ['#ffffff'], 'min': 0, 'max': 1, 'opacity': 0.8}
-            )
-            
+
             # Layer 3: Raw Water Mask (Spectral)
-            layers['water_mask'] = get_map_url(
-                water_mask.selfMask(),
-                {'palette': ['#00FFFF']} # Cyan High-Vis
-            )
+
+            # Request all three tile URLs concurrently; each getMapId is an
+            # independent I/O-bound round-trip.
+            analytics_tasks = [
+                ('depth', depth_map.updateMask(depth_map.gt(0)), props_depth),
+                ('analytics',
+                 ee.Image(0).paint(ee.Geometry.Point([0,0]), 0, 1).where(contours, 1).updateMask(contours),
+                 {'palette': ['#ffffff'], 'min': 0, 'max': 1, 'opacity': 0.8}),
+                ('water_mask', water_mask.selfMask(), {'palette': ['#00FFFF']}), # Cyan High-Vis
+            ]
+            # Direct GeoTIFF export of the depth raster. getDownloadURL
+            # returns a plain HTTPS URL immediately instead of queueing a
+            # rate-limited EE export task.
+            def get_depth_download_url(image):
+                try:
+                    return image.getDownloadURL({'scale': 30, 'region': roi, 'format': 'GEO_TIFF'})
+                except Exception as e:
+                    print(f"Error generating download URL: {e}")
+                    return None
+
+            futures = {name: _EXECUTOR.submit(get_map_url, image, viz)
+                       for name, image, viz in analytics_tasks}
+            depth_tiff_future = _EXECUTOR.submit(get_depth_download_url, depth_map)
+            for name, future in futures.items():
+                layers[name] = future.result()
+            layers['depth_tiff'] = depth_tiff_future.result()
 
         else:
             layers['depth'] = None
             layers['analytics'] = None
             layers['water_mask'] = None
+            layers['depth_tiff'] = None
 
-        return {
-            "area": round(current_area, 2),
-            "volume": round(volume_mcm, 2),
-            "max_volume": round(max_vol_mcm, 2),
-            "date": current_image.date().format('YYYY-MM-dd').getInfo() if current_image else "N/A",
-            "avg_elevation": round(avg_water_elev, 1),
-            "seasonal": {
-                "winter": round(winter_area, 2),
-                "summer": round(summer_area, 2),
-                "monsoon": round(monsoon_area, 2)
-            },
-            "layers": layers
-        }
+        for name, _, _, _ in seasons:
+            layers[name] = layer_futures[name].result() if name in layer_futures else None
+
+        yield {"layers": layers}
 
     except Exception as e:
         print(f"GEE Error: {e}")
-        import traceback
         traceback.print_exc()
-        return {"area": 0, "volume": 0, "error": str(e)}
+        yield {"area": 0, "volume": 0, "error": str(e)}
+
+def analyze_water(lat, lon):
+    """
+    Analyzes water at a specific location using Sentinel-2 and SRTM DEM.
+    Returns estimated area (km2), volume (MCM), and seasonal trends.
+    """
+    result = {}
+    for part in iter_analyze_water(lat, lon):
+        result.update(part)
+    return result
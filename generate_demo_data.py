@@ -3,6 +3,7 @@ import json
 import csv
 import math
 import os
+import numpy as np
 
 # Configuration
 CENTER_LAT = 12.500
@@ -14,13 +15,11 @@ SURFACE_ELEV = 100
 
 def generate_data():
     # 1. Generate Boundary (Circular Polygon)
-    boundary_coords = []
     points = 20
-    for i in range(points + 1): # Close the loop
-        angle = math.radians((i / points) * 360)
-        lat = CENTER_LAT + RADIUS_DEG * math.sin(angle)
-        lon = CENTER_LON + RADIUS_DEG * math.cos(angle)
-        boundary_coords.append([lon, lat]) # GeoJSON is [lon, lat]
+    angles = np.radians(np.linspace(0, 360, points + 1)) # Close the loop
+    lats = CENTER_LAT + RADIUS_DEG * np.sin(angles)
+    lons = CENTER_LON + RADIUS_DEG * np.cos(angles)
+    boundary_coords = np.column_stack([lons, lats]).tolist() # GeoJSON is [lon, lat]
 
     geojson = {
         "type": "FeatureCollection",
@@ -40,38 +39,35 @@ def generate_data():
         json.dump(geojson, f, indent=2)
 
     # 2. Generate Bathymetry (Bowl shape)
-    # Generate a grid of points
-    csv_data = []
-    
+    # Generate a grid of points - all the math is done on whole arrays so
+    # fine grids stay in NumPy's C loops instead of per-point Python.
     steps = int(math.sqrt(NUM_POINTS))
     step_size = (RADIUS_DEG * 2) / steps
-    
+
     start_lat = CENTER_LAT - RADIUS_DEG
     start_lon = CENTER_LON - RADIUS_DEG
-    
+
+    i, j = np.meshgrid(np.arange(steps), np.arange(steps), indexing='ij')
+    lat = start_lat + i * step_size
+    lon = start_lon + j * step_size
+
+    # Distance from center, normalized (0 to 1 at the rim)
+    dist = np.hypot(lat - CENTER_LAT, lon - CENTER_LON)
+    mask = dist <= RADIUS_DEG
+    norm_dist = dist / RADIUS_DEG
+
+    # Depth increases as we get closer to center (norm_dist -> 0)
+    # Elev = Surface - MaxDepth * (1 - norm_dist^2) -- Bowl shape
+    elev = SURFACE_ELEV - MAX_DEPTH * (1 - norm_dist**2)
+
     with open('demo_bathymetry.csv', 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(['lat', 'lon', 'elevation'])
-        
-        for i in range(steps):
-            for j in range(steps):
-                lat = start_lat + i * step_size
-                lon = start_lon + j * step_size
-                
-                # Check distance from center
-                dist = math.sqrt((lat - CENTER_LAT)**2 + (lon - CENTER_LON)**2)
-                
-                if dist <= RADIUS_DEG:
-                    # Parabolic depth: z = r^2
-                    # Normalized distance (0 to 1)
-                    norm_dist = dist / RADIUS_DEG
-                    
-                    # Depth increases as we get closer to center (norm_dist -> 0)
-                    # Elev = Surface - MaxDepth * (1 - norm_dist^2) -- Bowl shape
-                    depth = MAX_DEPTH * (1 - norm_dist**2)
-                    elev = SURFACE_ELEV - depth
-                    
-                    writer.writerow([round(lat, 6), round(lon, 6), round(elev, 2)])
+
+        # Round as whole arrays and hand the writer everything at once
+        writer.writerows(zip(np.round(lat[mask], 6),
+                             np.round(lon[mask], 6),
+                             np.round(elev[mask], 2)))
 
 if __name__ == "__main__":
     generate_data()
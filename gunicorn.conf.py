@@ -0,0 +1,23 @@
+
+# Loaded automatically by gunicorn (./gunicorn.conf.py).
+#
+# With --preload the master imports server.py, and initialize_gee() makes a
+# real authenticated HTTPS call - so at fork time the ee client holds an open
+# keep-alive TLS socket. Letting all workers reuse that inherited socket
+# concurrently corrupts/hangs responses, so each worker drops the master's
+# client state and re-initializes its own connection.
+#
+# This has to happen in post_worker_init, not post_fork: post_fork fires
+# before the gevent worker's init_process() runs monkey.patch_all(), so a
+# connection opened there would sit on a pre-patch blocking socket and
+# stall the worker's whole event loop on every GEE round-trip.
+# post_worker_init runs after patching, so the re-init gets a cooperative
+# socket.
+
+def post_worker_init(worker):
+    import ee
+    import gee_logic
+
+    ee.Reset()
+    gee_logic._INITIALIZED = False
+    gee_logic.initialize_gee()
@@ -1,14 +1,20 @@
 
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
-from gee_logic import initialize_gee, analyze_water
+from gee_logic import initialize_gee, analyze_water, iter_analyze_water
 import requests
 import os
+import time
+import orjson
 
 app = Flask(__name__, template_folder='.')
 CORS(app) # Enable CORS for all routes
 
+# Full result dicts (tile URLs etc.) only hit the log at DEBUG; production
+# can raise the threshold without code changes
+app.logger.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
+
 # --- GEE Authentication Helper for Render/Cloud ---
 # If GEE_CREDENTIALS_JSON env var exists, write it to a file
 gee_json = os.getenv('GEE_CREDENTIALS_JSON')
@@ -33,6 +39,30 @@ def index():
 def serve_config():
     return send_from_directory('.', 'config.js')
 
+# --- Analysis result cache ---
+# The full GEE pipeline takes seconds; repeat clicks on the same spot
+# shouldn't rerun it. Coordinates are bucketed to 3 decimals (~100m) so
+# nearby clicks share an entry, and entries expire after a day so fresh
+# imagery still shows up.
+ANALYZE_CACHE = {}
+ANALYZE_CACHE_TTL = 86400 # seconds
+ANALYZE_CACHE_MAX = 1024
+
+def cached_analyze(lat, lng):
+    key = (round(lat, 3), round(lng, 3))
+    now = time.time()
+    hit = ANALYZE_CACHE.get(key)
+    if hit and now - hit[0] < ANALYZE_CACHE_TTL:
+        return hit[1]
+
+    result = analyze_water(lat, lng)
+    if 'error' not in result:
+        # Evict oldest entries to keep the cache bounded
+        while len(ANALYZE_CACHE) >= ANALYZE_CACHE_MAX:
+            ANALYZE_CACHE.pop(next(iter(ANALYZE_CACHE)))
+        ANALYZE_CACHE[key] = (now, result)
+    return result
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     data = request.json
@@ -42,12 +72,17 @@ def analyze():
     if lat is None or lng is None:
         return jsonify({"error": "Missing coordinates"}), 400
 
-    print(f"Analyzing location: Lat {lat}, Lng {lng}")
+    app.logger.info(f"Analyzing location: Lat {lat}, Lng {lng}")
     try:
-        # Call GEE Logic
-        result = analyze_water(lat, lng)
-        print(f"Analysis result: {result}")
-        return jsonify(result)
+        # Call GEE Logic (cached per ~100m coordinate bucket)
+        result = cached_analyze(lat, lng)
+        app.logger.debug(f"Analysis result: {result}")
+        # orjson encodes the response (incl. numpy scalars) in one C call;
+        # jsonify's stdlib encoder is much slower on float-heavy payloads
+        return app.response_class(
+            orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY),
+            mimetype='application/json'
+        )
     except Exception as e:
         import traceback
         print("Exception during analysis:")
@@ -55,6 +90,35 @@ def analyze():
         print(tb)
         return jsonify({"error": f"Internal server error: {str(e)}", "details": tb}), 500
 
+# Shared outbound session: keep-alive + a connection pool so proxied calls
+# reuse TLS connections instead of a fresh handshake per request. (The ee
+# client keeps its own authorized session per process.)
+http_session = requests.Session()
+http_session.mount('https://', requests.adapters.HTTPAdapter(
+    pool_connections=32, pool_maxsize=64))
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """NDJSON variant of /api/analyze: the scalar metrics arrive as the
+    first line, the map-layer URLs as the second, so the UI can render
+    numbers several seconds before the tiles are ready. Bypasses the
+    result cache (partial phases aren't cached)."""
+    data = request.json
+    lat = data.get('lat')
+    lng = data.get('lng')
+
+    if lat is None or lng is None:
+        return jsonify({"error": "Missing coordinates"}), 400
+
+    app.logger.info(f"Analyzing location (stream): Lat {lat}, Lng {lng}")
+
+    def generate():
+        for part in iter_analyze_water(lat, lng):
+            yield orjson.dumps(part, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n'
+
+    return app.response_class(stream_with_context(generate()),
+                              mimetype='application/x-ndjson')
+
 # --- Gemini AI Proxy ---
 @app.route('/api/gemini', methods=['POST'])
 def gemini_proxy():
@@ -69,7 +133,7 @@ def gemini_proxy():
     url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
     
     try:
-        response = requests.post(url, json=data, headers={'Content-Type': 'application/json'})
+        response = http_session.post(url, json=data, headers={'Content-Type': 'application/json'})
         if response.status_code != 200:
              print(f"Gemini API Error: {response.text}")
              return jsonify({"error": f"Gemini API Error: {response.text}"}), response.status_code